@@ -0,0 +1,345 @@
+"""
+Batch runner for a TOML/YAML job spec.
+
+Each job names a strategy, the symbols it trades, its params and a date
+range. The spec is planned as a graph of data, indicator and backtest
+nodes, so every symbol/range is downloaded once and every indicator that
+several vectorized jobs ask for is computed once. The backtests are then
+spread over a process pool and each finished job is appended to a JSONL
+checkpoint, which lets an interrupted batch pick up where it stopped.
+
+    python -m src.backtest_strategies.batch jobs.toml --workers 4
+"""
+import sys
+import os
+import json
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import backtrader as bt
+
+from src.backtest_strategies.data import TIMEFRAMES, infer_periods_per_year, load
+from src.backtest_strategies.run import FEED_TIMEFRAMES, STRATEGIES, make_feed
+from src.backtest_strategies.strategies.pairs_trading import PairsTrading
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    tomllib = None
+
+BACKTRADER_STRATEGIES = dict(STRATEGIES, PairsTrading=PairsTrading)
+
+# ==========================================
+# VECTORIZED STRATEGIES
+# ==========================================
+
+INDICATORS = {
+    'sma': lambda close, window: close.rolling(window=window).mean(),
+    'ema': lambda close, window: close.ewm(span=window, adjust=False).mean(),
+    'high_line': lambda close, window: close.rolling(window=window).max().shift(1),
+    'low_line': lambda close, window: close.rolling(window=window).min().shift(1),
+}
+
+
+def _crossover_position(close, fast, slow):
+    signal = (fast > slow).astype(int)
+    return signal.shift(1), signal.diff().abs().sum()
+
+
+def _donchian_position(close, high_line, low_line):
+    signal = pd.Series(0, index=close.index)
+    signal[close > high_line] = 1
+    signal[close < low_line] = -1
+    position = signal.replace(0, np.nan).ffill().fillna(0).clip(lower=0)
+    return position.shift(1), position.diff().abs().sum()
+
+
+# strategy -> (indicators it needs as (name, param, default window), position function)
+VECTORIZED = {
+    'vectorized.sma': ((('sma', 'fast_window', 20), ('sma', 'slow_window', 50)), _crossover_position),
+    'vectorized.ema': ((('ema', 'fast_window', 20), ('ema', 'slow_window', 50)), _crossover_position),
+    'vectorized.donchian': ((('high_line', 'entry_window', 20), ('low_line', 'exit_window', 10)), _donchian_position),
+}
+
+
+def _required_indicators(job):
+    requires, _ = VECTORIZED[job['strategy']]
+    return [(name, job['params'].get(param, default)) for name, param, default in requires]
+
+
+# ==========================================
+# SPEC & PLANNING
+# ==========================================
+
+def load_spec(path):
+    with open(path, 'rb') as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml  # only needed for YAML specs
+            return yaml.safe_load(f)
+        if tomllib is None:
+            raise RuntimeError("TOML specs need Python 3.11+; use a YAML spec instead")
+        return tomllib.load(f)
+
+
+def job_id(job):
+    params = json.dumps(job['params'], sort_keys=True)
+    return (f"{job['strategy']}|{'-'.join(job['symbols'])}|{job['timeframe']}|"
+            f"{job['start']}|{job['end']}|{job['cash']}|{params}")
+
+
+def expand_jobs(spec):
+    """Expand every spec entry over its symbols, date ranges and param sets."""
+    defaults = spec.get('defaults', {})
+    jobs = {}
+    for entry in spec.get('jobs', []):
+        strategy = entry['strategy']
+        if strategy not in BACKTRADER_STRATEGIES and strategy not in VECTORIZED:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        timeframe = entry.get('timeframe', defaults.get('timeframe', '1d'))
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unknown timeframe: {timeframe}")
+
+        ranges = entry.get('ranges') or [[entry.get('start', defaults.get('start')),
+                                          entry.get('end', defaults.get('end'))]]
+        params_list = entry.get('params', {})
+        if isinstance(params_list, dict):
+            params_list = [params_list]
+
+        for symbols, (start, end), params in itertools.product(entry['symbols'], ranges, params_list):
+            symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+            if strategy in VECTORIZED and len(symbols) != 1:
+                raise ValueError(f"{strategy} trades a single symbol, got {symbols}")
+            job = {
+                'strategy': strategy,
+                'symbols': symbols,
+                'timeframe': timeframe,
+                'start': str(start),
+                'end': str(end),
+                'params': params,
+                'cash': entry.get('cash', defaults.get('cash', 10000.0)),
+            }
+            job['id'] = job_id(job)
+            jobs.setdefault(job['id'], job)
+    return list(jobs.values())
+
+
+def plan(jobs):
+    """
+    Build the dependency graph as {node: [dependencies]}.
+
+    Nodes are ('data', symbol, timeframe, start, end), ('indicator', symbol,
+    timeframe, start, end, name, window) and ('backtest', job id). Jobs that
+    share a symbol, timeframe and range share the data node, and vectorized
+    jobs that ask for the same indicator share the indicator node.
+    Backtrader strategies build their indicators inside Cerebro, so they
+    only depend on data nodes.
+    """
+    graph = {}
+    for job in jobs:
+        deps = []
+        for symbol in job['symbols']:
+            data_key = ('data', symbol, job['timeframe'], job['start'], job['end'])
+            graph.setdefault(data_key, [])
+            deps.append(data_key)
+        if job['strategy'] in VECTORIZED:
+            for name, window in _required_indicators(job):
+                key = ('indicator',) + data_key[1:] + (name, window)
+                graph.setdefault(key, [data_key])
+                deps.append(key)
+        graph[('backtest', job['id'])] = deps
+    return graph
+
+
+# ==========================================
+# EXECUTION
+# ==========================================
+
+class PositionChanges(bt.Analyzer):
+    """
+    Trade count on the vectorized jobs' definition: the summed absolute change
+    in the sign of the first data's position, so an entry or an exit counts
+    one and a reversal two. Pairs legs moving on the same bar count once.
+    """
+
+    def start(self):
+        self.sign = 0
+        self.total = 0
+
+    def next(self):
+        size = self.strategy.getposition(self.strategy.datas[0]).size
+        sign = (size > 0) - (size < 0)
+        self.total += abs(sign - self.sign)
+        self.sign = sign
+
+    def get_analysis(self):
+        return {'total': self.total}
+
+
+def _vectorized_metrics(strategy_return, trades):
+    cumulative_return = (1 + strategy_return).cumprod()
+    periods = infer_periods_per_year(strategy_return.index)
+    return {
+        'total_return': cumulative_return.iloc[-1] - 1,
+        'sharpe': np.sqrt(periods) * strategy_return.mean() / strategy_return.std(),
+        'max_drawdown': (cumulative_return / cumulative_return.cummax() - 1).min(),
+        'total_trades': int(trades),
+    }
+
+
+def _run_vectorized(job, frames, lines):
+    close = frames[0]['close']
+    _, position_fn = VECTORIZED[job['strategy']]
+    position, trades = position_fn(close, *lines)
+    return _vectorized_metrics(position * close.pct_change(), trades)
+
+
+def _run_backtrader(job, frames, lines):
+    cerebro = bt.Cerebro()
+    cerebro.broker.setcash(job['cash'])
+    for symbol, df in zip(job['symbols'], frames):
+        cerebro.adddata(make_feed(df, job['timeframe']), name=symbol)
+    tf, compression = FEED_TIMEFRAMES[job['timeframe']]
+    cerebro.addanalyzer(bt.analyzers.TimeReturn, _name='returns', timeframe=tf, compression=compression)
+    cerebro.addanalyzer(PositionChanges, _name='trades')
+    cerebro.addstrategy(BACKTRADER_STRATEGIES[job['strategy']], **job['params'])
+    strat = cerebro.run()[0]
+
+    # Per-bar portfolio returns go through the same metrics as the vectorized jobs
+    returns = pd.Series(strat.analyzers.getbyname('returns').get_analysis())
+    trades = strat.analyzers.getbyname('trades').get_analysis()['total']
+    return _vectorized_metrics(returns, trades)
+
+
+def run_job(job, frames, lines):
+    """Run one backtest from its already loaded frames and indicator lines."""
+    runner = _run_vectorized if job['strategy'] in VECTORIZED else _run_backtrader
+    metrics = runner(job, frames, lines)
+    return {k: None if v is None or pd.isna(v) else getattr(v, 'item', lambda: v)() for k, v in metrics.items()}
+
+
+def read_checkpoint(path):
+    done = {}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    done[record['id']] = record
+    return done
+
+
+def _execute(tasks, workers):
+    """Yield (job, metrics, error) for every (job, frames, lines) task as it finishes."""
+    if workers <= 1:
+        for job, frames, lines in tasks:
+            try:
+                yield job, run_job(job, frames, lines), None
+            except Exception as exc:
+                yield job, None, exc
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, *task): task[0] for task in tasks}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as exc:
+                yield futures[future], None, exc
+
+
+def run_batch(jobs, workers=1, checkpoint=None, loader=load):
+    """
+    Run every job, skipping those already recorded in ``checkpoint``.
+
+    Returns one record per successful job (restored or new), in spec order.
+    Failed jobs are reported but not checkpointed, so a rerun retries them.
+    """
+    done = read_checkpoint(checkpoint)
+    pending = [job for job in jobs if job['id'] not in done]
+    total = len(jobs)
+    print(f"{total - len(pending)} of {total} jobs restored from checkpoint")
+
+    graph = plan(pending)
+
+    # yfinance keeps module-level state per download, so loads stay sequential.
+    # A node that fails only fails the jobs depending on it.
+    values = {}
+    errors = {}
+    for key in graph:
+        if key[0] == 'data':
+            _, symbol, timeframe, start, end = key
+            print(f"Loading {symbol} {timeframe} {start} -> {end}...")
+            try:
+                values[key] = loader(symbol, start, end, timeframe)
+            except Exception as exc:
+                print(f"Loading {symbol} FAILED: {exc}")
+                errors[key] = exc
+    for key, deps in graph.items():
+        if key[0] == 'indicator':
+            if deps[0] in errors:
+                errors[key] = errors[deps[0]]
+                continue
+            values[key] = INDICATORS[key[5]](values[deps[0]]['close'], key[6])
+
+    finished = total - len(pending)
+    tasks = []
+    for job in pending:
+        deps = graph[('backtest', job['id'])]
+        failed = [k for k in deps if k in errors]
+        if failed:
+            finished += 1
+            print(f"[{finished}/{total}] {job['id']} FAILED: {errors[failed[0]]}")
+            continue
+        frames = [values[k] for k in deps if k[0] == 'data']
+        lines = [values[k] for k in deps if k[0] == 'indicator']
+        tasks.append((job, frames, lines))
+
+    for job, metrics, error in _execute(tasks, workers):
+        finished += 1
+        if error is not None:
+            print(f"[{finished}/{total}] {job['id']} FAILED: {error}")
+            continue
+        print(f"[{finished}/{total}] {job['id']} done")
+        record = dict(job, metrics=metrics)
+        done[job['id']] = record
+        if checkpoint:
+            with open(checkpoint, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+
+    return [done[job['id']] for job in jobs if job['id'] in done]
+
+
+def main(argv=None):
+    argv = argv or sys.argv[1:]
+    parser = argparse.ArgumentParser(
+        prog="backtest-batch",
+        description="Run a TOML/YAML job spec of strategies with shared data loads."
+    )
+    parser.add_argument("spec", help="Path to a .toml or .yaml job spec")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", default=None, help="JSONL file of finished jobs")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    workers = args.workers or spec.get('workers', os.cpu_count() or 1)
+    checkpoint = args.checkpoint or spec.get('checkpoint')
+    if args.restart and checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    records = run_batch(expand_jobs(spec), workers=workers, checkpoint=checkpoint)
+
+    summary = pd.DataFrame([dict(strategy=r['strategy'], symbols='-'.join(r['symbols']),
+                                 timeframe=r['timeframe'], start=r['start'], end=r['end'], params=json.dumps(r['params']),
+                                 **r['metrics']) for r in records])
+    if not summary.empty:
+        print(summary.sort_values('sharpe', ascending=False).to_string(index=False))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from pandas.tseries.frequencies import to_offset
+
+OHLCV = ['open', 'high', 'low', 'close', 'volume']
+AGGREGATION = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+# Timeframe -> pandas resample rule, finest first. Names are also yfinance intervals.
+TIMEFRAMES = {
+    '1m': '1min',
+    '5m': '5min',
+    '15m': '15min',
+    '30m': '30min',
+    '1h': '1h',
+    '1d': '1D',
+    '1wk': 'W-MON',
+    '1mo': 'MS',
+}
+
+# Coarser timeframes are always built from daily bars rather than fetched
+COARSEST_BASE = '1d'
+
+CACHE_DIR = os.environ.get('BARS_CACHE_DIR', os.path.join('data', 'bars'))
+
+
+def download(symbol, start, end, interval='1d'):
+    """Download bars for one symbol as a lowercase OHLCV frame."""
+    df = yf.download(symbol, start=pd.Timestamp(start).to_pydatetime(), end=pd.Timestamp(end).to_pydatetime(),
+                     interval=interval, multi_level_index=False, progress=False)
+    if df.empty:
+        return pd.DataFrame(columns=OHLCV, dtype=float)
+    df.columns = [c.lower() for c in df.columns]
+    return df[OHLCV].dropna()
+
+
+def infer_periods_per_year(index):
+    """
+    Bars per year implied by the spacing of ``index``, for annualising.
+
+    Counts the bars actually traded, so daily bars give about 252 for
+    equities and 365 for crypto, and hourly bars about 1764 and 8760.
+    """
+    if len(index) < 2:
+        return np.nan
+    years = (index[-1] - index[0]) / pd.Timedelta(days=365.25)
+    return (len(index) - 1) / years
+
+
+def _is_intraday(timeframe):
+    return _rank(timeframe) < _rank('1d')
+
+
+def _rank(timeframe):
+    return list(TIMEFRAMES).index(timeframe)
+
+
+def resample(bars, timeframe, origin=None):
+    """
+    Aggregate OHLCV bars into a coarser timeframe, dropping periods with no bars.
+
+    Intraday bins are anchored at ``origin``, by default the first bar, so
+    hourly bars built from a 09:30 open run 09:30-10:29 like yfinance's
+    rather than starting with a half-hour 09:00 bin. Daily and coarser bins
+    follow the calendar.
+    """
+    kwargs = {}
+    if _is_intraday(timeframe) and len(bars):
+        kwargs['origin'] = bars.index[0] if origin is None else origin
+    out = bars.resample(TIMEFRAMES[timeframe], label='left', closed='left', **kwargs).agg(AGGREGATION)
+    return out.dropna(subset=['close'])
+
+
+def _bound(ts, index):
+    ts = pd.Timestamp(ts)
+    if index.tz is not None and ts.tz is None:
+        ts = ts.tz_localize(index.tz)
+    return ts
+
+
+def _naive(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize(None) if ts.tz is not None else ts
+
+
+class BarStore:
+    """
+    On-disk cache of base bars per symbol and every timeframe derived from them.
+
+    Each symbol keeps a daily base, from which daily and coarser timeframes
+    are aggregated, and one base per intraday interval, fetched at that
+    interval since yfinance only serves a short intraday history. Every base
+    lives in its own directory with its own metadata, and only the part of a
+    requested range that is not covered yet is downloaded. Derived
+    timeframes are cached next to their base and, when new base bars are
+    appended, re-aggregated only from the first period the new bars touch.
+    """
+
+    def __init__(self, root=CACHE_DIR, fetch=download):
+        self.root = root
+        self.fetch = fetch
+
+    def _path(self, symbol, interval, name):
+        return os.path.join(self.root, symbol, interval, name)
+
+    def _read_meta(self, symbol, interval='1d'):
+        path = self._path(symbol, interval, 'meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_meta(self, symbol, meta, interval='1d'):
+        os.makedirs(os.path.join(self.root, symbol, interval), exist_ok=True)
+        with open(self._path(symbol, interval, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+    def _read(self, symbol, timeframe, interval='1d'):
+        path = self._path(symbol, interval, f"{timeframe}.pkl")
+        return pd.read_pickle(path) if os.path.exists(path) else None
+
+    def _write(self, symbol, timeframe, bars, interval='1d'):
+        os.makedirs(os.path.join(self.root, symbol, interval), exist_ok=True)
+        bars.to_pickle(self._path(symbol, interval, f"{timeframe}.pkl"))
+
+    def append(self, symbol, bars, interval='1d', start=None, end=None):
+        """
+        Merge new base bars into the cache and patch every derived timeframe.
+
+        Bars sharing a timestamp with stored ones replace them. [start, end)
+        is recorded as covered, by default the span of the new bars; a range
+        that leaves a gap to the covered one is stored but not recorded.
+        Each derived timeframe keeps its periods before the one holding the
+        earliest new bar and is re-aggregated only from there. Returns the
+        base's metadata, or None when nothing is cached for it.
+        """
+        meta = self._read_meta(symbol, interval)
+        bars = bars[OHLCV]
+        if bars.empty:
+            return meta
+        if meta is None:
+            meta = {'start': None, 'end': None, 'derived': []}
+
+        first = _naive(bars.index.min() if start is None else start)
+        last = _naive(bars.index.max() + to_offset(TIMEFRAMES[interval]) if end is None else end)
+        if meta['start'] is None:
+            meta['start'], meta['end'] = str(first), str(last)
+        elif first <= pd.Timestamp(meta['end']) and last >= pd.Timestamp(meta['start']):
+            meta['start'] = str(min(first, pd.Timestamp(meta['start'])))
+            meta['end'] = str(max(last, pd.Timestamp(meta['end'])))
+
+        base = self._read(symbol, interval, interval)
+        changed = bars.index.min()
+        if base is not None:
+            bars = pd.concat([base, bars])
+            bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+        self._write(symbol, interval, bars, interval)
+
+        for timeframe in meta['derived']:
+            derived = self._read(symbol, timeframe, interval)
+            kept = derived.index[derived.index <= changed]
+            if len(kept) == 0:
+                derived = resample(bars, timeframe)
+            else:
+                period = kept[-1]
+                derived = pd.concat([derived[derived.index < period],
+                                     resample(bars[bars.index >= period], timeframe, origin=period)])
+            self._write(symbol, timeframe, derived, interval)
+
+        self._write_meta(symbol, meta, interval)
+        return meta
+
+    def update(self, symbol, start, end, interval='1d'):
+        """
+        Download whatever part of [start, end) is not covered yet and append it.
+
+        A download that returns bars covers its whole range, weekends and
+        closed hours at either end included, up to the present. An empty
+        download (yfinance's answer to network and ticker errors as well as
+        to genuinely empty ranges) is not recorded, so the range is tried
+        again on the next call.
+        """
+        meta = self._read_meta(symbol, interval)
+        if meta is None:
+            missing = [(start, end)]
+        else:
+            missing = []
+            if _naive(start) < pd.Timestamp(meta['start']):
+                missing.append((start, meta['start']))
+            if _naive(end) > pd.Timestamp(meta['end']):
+                missing.append((meta['end'], end))
+
+        for s, e in missing:
+            fetched = self.fetch(symbol, s, e, interval)
+            if not fetched.empty:
+                # Bars still to come are not covered by today's download
+                meta = self.append(symbol, fetched, interval, start=s, end=min(_naive(e), pd.Timestamp.now()))
+        return meta
+
+    def bars(self, symbol, start, end, timeframe='1d'):
+        """
+        Bars for [start, end) at ``timeframe``.
+
+        Intraday timeframes come from their own base; daily and coarser ones
+        are always built from the daily base.
+        """
+        base = timeframe if _is_intraday(timeframe) else COARSEST_BASE
+        meta = self.update(symbol, start, end, interval=base)
+        if meta is None:
+            return pd.DataFrame(columns=OHLCV, dtype=float)
+
+        bars = self._read(symbol, timeframe, base)
+        if bars is None:
+            bars = resample(self._read(symbol, base, base), timeframe)
+            self._write(symbol, timeframe, bars, base)
+            meta['derived'].append(timeframe)
+            self._write_meta(symbol, meta, base)
+
+        return bars[(bars.index >= _bound(start, bars.index)) & (bars.index < _bound(end, bars.index))]
+
+
+def load(symbol, start, end, timeframe='1d'):
+    """Bars for one symbol at ``timeframe`` from the default on-disk cache."""
+    return BarStore().bars(symbol, start, end, timeframe)
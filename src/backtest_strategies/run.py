@@ -2,9 +2,9 @@ import sys
 import os
 import argparse
 import backtrader as bt
-import yfinance as yf
 import matplotlib.pyplot as plt
 
+from src.backtest_strategies.data import TIMEFRAMES, load
 from src.backtest_strategies.strategies.buy_hold import BuyHold
 from src.backtest_strategies.strategies.sma_golden_cross import SMAGoldenCross
 from src.backtest_strategies.strategies.ema_golden_cross import EMAGoldenCross
@@ -21,6 +21,22 @@ STRATEGIES = {
     "SMAGoldenCross": SMAGoldenCross,
 }
 
+# Bar timeframe -> (backtrader timeframe, compression) for the data feed
+FEED_TIMEFRAMES = {
+    "1m": (bt.TimeFrame.Minutes, 1),
+    "5m": (bt.TimeFrame.Minutes, 5),
+    "15m": (bt.TimeFrame.Minutes, 15),
+    "30m": (bt.TimeFrame.Minutes, 30),
+    "1h": (bt.TimeFrame.Minutes, 60),
+    "1d": (bt.TimeFrame.Days, 1),
+    "1wk": (bt.TimeFrame.Weeks, 1),
+    "1mo": (bt.TimeFrame.Months, 1),
+}
+
+def make_feed(df, timeframe="1d"):
+    tf, compression = FEED_TIMEFRAMES[timeframe]
+    return bt.feeds.PandasData(dataname=df, timeframe=tf, compression=compression)
+
 def main(argv=None):
     argv = argv or sys.argv[1:]
     parser = argparse.ArgumentParser(
@@ -31,17 +47,16 @@ def main(argv=None):
     parser.add_argument("--symbol", default="TSM")
     parser.add_argument("--start", default="2015-01-01")
     parser.add_argument("--end", default="2019-12-31")
+    parser.add_argument("--timeframe", default="1d", choices=TIMEFRAMES.keys())
     args = parser.parse_args(argv)
 
-    # Download data
-    df = yf.download(args.symbol, start=args.start, end=args.end)
-    df = df[['Open','High','Low','Close','Volume']]
-    df.columns = ['open','high','low','close','volume']
+    # Load data (cached; coarser timeframes are aggregated from stored bars)
+    df = load(args.symbol, args.start, args.end, args.timeframe)
 
     # Cerebro setup
     cerebro = bt.Cerebro()
     cerebro.broker.setcash(10000.0)
-    data = bt.feeds.PandasData(dataname=df)
+    data = make_feed(df, args.timeframe)
     cerebro.adddata(data)
     cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
     cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
@@ -1,20 +1,21 @@
+import sys
+import argparse
 import backtrader as bt
-import yfinance as yf
+from src.backtest_strategies.data import TIMEFRAMES, load
+from src.backtest_strategies.run import make_feed
 from src.backtest_strategies.strategies.pairs_trading import PairsTrading
 
-def run_pairs():
+def run_pairs(timeframe='1d'):
     cerebro = bt.Cerebro()
     cerebro.addstrategy(PairsTrading, hedge_ratio=0.59, qty=100)
 
-    print("Downloading Data for PSX (Phillips 66) and XOM (Exxon)...")
+    print("Loading Data for PSX (Phillips 66) and XOM (Exxon)...")
 
-    psx_df = yf.download('PSX', start='2022-01-01', end='2023-01-01', multi_level_index=False).dropna()
-    psx_df.columns = [c.lower() for c in psx_df.columns]
-    psx_data = bt.feeds.PandasData(dataname=psx_df)
+    psx_df = load('PSX', '2022-01-01', '2023-01-01', timeframe)
+    psx_data = make_feed(psx_df, timeframe)
 
-    xom_df = yf.download('XOM', start='2022-01-01', end='2023-01-01', multi_level_index=False).dropna()
-    xom_df.columns = [c.lower() for c in xom_df.columns]
-    xom_data = bt.feeds.PandasData(dataname=xom_df)
+    xom_df = load('XOM', '2022-01-01', '2023-01-01', timeframe)
+    xom_data = make_feed(xom_df, timeframe)
 
     cerebro.adddata(psx_data, name='PSX')
     cerebro.adddata(xom_data, name='XOM')
@@ -28,4 +29,6 @@ def run_pairs():
     cerebro.plot(style='candlestick', volume=False)
 
 if __name__ == '__main__':
-    run_pairs()
+    parser = argparse.ArgumentParser(description="Run the PSX/XOM pairs trading backtest.")
+    parser.add_argument("--timeframe", default="1d", choices=TIMEFRAMES.keys())
+    run_pairs(parser.parse_args(sys.argv[1:]).timeframe)
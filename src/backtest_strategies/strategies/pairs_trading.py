@@ -15,7 +15,7 @@ class SafeDivide(bt.Indicator):
             self.lines.output[0] = self.params.numerator[0] / denom
 
 class PairsTrading(bt.Strategy):
-    params = (('period', 15), ('devfactor', 2.0), ('qty', 10), ('hedge_ratio', 1.0))
+    params = (('period', 15), ('devfactor', 2.0), ('exitfactor', 0.5), ('qty', 10), ('hedge_ratio', 1.0))
 
     def __init__(self):
         self.spread = self.datas[0].close - (self.params.hedge_ratio * self.datas[1].close)
@@ -38,6 +38,6 @@ class PairsTrading(bt.Strategy):
                 self.sell(data=self.datas[1], size=hedge_qty)
                      
         else:
-            if abs(z) < 0.5:
+            if abs(z) < self.params.exitfactor:
                 self.close(data=self.datas[0])
                 self.close(data=self.datas[1])
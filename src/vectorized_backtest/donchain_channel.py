@@ -1,19 +1,19 @@
-import yfinance as yf
+import sys
+import os
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
-def don_channel():
-    ticker = "ETH-USD"
-    print(f"Downloading {ticker} data...")
-
-    data = yf.download(ticker, start="2023-01-01", end="2025-01-01")['Close']
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from src.backtest_strategies.data import TIMEFRAMES, infer_periods_per_year, load
 
+def don_channel(timeframe='1d', periods_per_year=None):
+    ticker = "ETH-USD"
+    print(f"Loading {ticker} data...")
 
-    if isinstance(data, pd.Series):
-        data = data.to_frame(name='Close')
-    else:
-        data.columns = ['Close']
+    data = load(ticker, "2023-01-01", "2025-01-01", timeframe)[['close']]
+    data.columns = ['Close']
 
 
     entry_window = 20
@@ -40,7 +40,7 @@ def don_channel():
 
 
     total_trades = data['Position'].diff().abs().sum()
-    sharpe_ratio = np.sqrt(252) * data['Strategy_Return'].mean() / data['Strategy_Return'].std()
+    sharpe_ratio = np.sqrt(periods_per_year or infer_periods_per_year(data.index)) * data['Strategy_Return'].mean() / data['Strategy_Return'].std()
 
     cum_max = data['Cumulative_Return'].cummax()
     drawdown = (data['Cumulative_Return'] - cum_max) / cum_max
@@ -82,4 +82,9 @@ def don_channel():
     plt.show()
 
 if __name__ == "__main__":
-    don_channel()
+    parser = argparse.ArgumentParser(description="Run the vectorized Donchian channel breakout on ETH-USD.")
+    parser.add_argument("--timeframe", default="1d", choices=TIMEFRAMES.keys())
+    parser.add_argument("--periods-per-year", type=float, help="Bars per year for the Sharpe ratio (default: inferred)")
+    args = parser.parse_args()
+
+    don_channel(args.timeframe, args.periods_per_year)
@@ -1,18 +1,19 @@
-import yfinance as yf
+import sys
+import os
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
-def ema_strategy():
-    ticker = "ETH-USD"
-    print(f"Downloading {ticker} data......")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from src.backtest_strategies.data import TIMEFRAMES, infer_periods_per_year, load
 
-    data = yf.download(ticker, start="2023-01-01", end="2025-01-01")['Close']
+def ema_strategy(timeframe='1d', periods_per_year=None):
+    ticker = "ETH-USD"
+    print(f"Loading {ticker} data......")
 
-    if isinstance(data, pd.Series):
-        data = data.to_frame(name='Close')
-    else:
-        data.columns = ['Close']
+    data = load(ticker, "2023-01-01", "2025-01-01", timeframe)[['close']]
+    data.columns = ['Close']
 
     fast_window = 20
     slow_window = 50
@@ -36,7 +37,7 @@ def ema_strategy():
 
     total_return = data['cumulative_return'].iloc[-1] - 1
     trades = data["signal"].diff().abs().sum()
-    sharpe_ratio = np.sqrt(252) * data['strategy_return'].mean() / data['strategy_return'].std()
+    sharpe_ratio = np.sqrt(periods_per_year or infer_periods_per_year(data.index)) * data['strategy_return'].mean() / data['strategy_return'].std()
     max_drawdown = (data['cumulative_return'] / data['cumulative_return'].cummax() - 1).min()
 
     print(f"---- Metric Results of {ticker} ----")
@@ -80,4 +81,9 @@ def ema_strategy():
     plt.show()
 
 if __name__ == "__main__":
-    ema_strategy()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the vectorized EMA crossover on ETH-USD.")
+    parser.add_argument("--timeframe", default="1d", choices=TIMEFRAMES.keys())
+    parser.add_argument("--periods-per-year", type=float, help="Bars per year for the Sharpe ratio (default: inferred)")
+    args = parser.parse_args()
+
+    ema_strategy(args.timeframe, args.periods_per_year)
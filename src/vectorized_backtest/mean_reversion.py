@@ -1,4 +1,6 @@
-import yfinance as yf
+import sys
+import os
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -7,47 +9,59 @@ import statsmodels.api as sm
 import warnings
 warnings.filterwarnings("ignore")
 
-def vectorized_backtest():
-    tickers = ['XOM', 'CVX']
-    data = yf.download(tickers, start='2023-01-01', end='2025-01-01')['Close']
-    data = data.dropna()
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from src.backtest_strategies.data import TIMEFRAMES, infer_periods_per_year, load
 
+def hedged_spread(data, window=70):
+    """Rolling OLS hedge ratio of CVX on XOM and the spread it implies."""
     # Calculate rolling OLS
-    window = 70
     y = data['CVX']
     X = sm.add_constant(data['XOM'])
 
     model = RollingOLS(y, X, window = window)
     rolling_res = model.fit()
 
+    data = data.copy()
     data['beta'] = rolling_res.params['XOM']
     data = data.dropna()
 
     data['spread'] = data['CVX'] - (data['beta'] * data['XOM'])
+    return data
+
+
+def backtest(data, window=70, z_window=35, entry_threshold=2.0, exit_threshold=0.5):
+    data = hedged_spread(data, window)
 
-    z_window = 35
     data['mean'] = data['spread'].rolling(window = z_window).mean()
     data['std'] = data['spread'].rolling(window = z_window).std()
     data['z_score'] = (data['spread'] - data['mean']) / data['std']
 
-    data['signal'] = 0
-    entry_thresold = 2.0
+    # Enter on a threshold cross, go flat inside the exit band, otherwise hold
+    data['signal'] = np.nan
+    data.loc[abs(data['z_score']) < exit_threshold, 'signal'] = 0
+    data.loc[data['z_score'] > entry_threshold, 'signal'] = -1
+    data.loc[data['z_score'] < -entry_threshold, 'signal'] = 1
 
-    data.loc[data['z_score'] > entry_thresold, 'signal'] = -1
-    data.loc[data['z_score'] < -entry_thresold, 'signal'] = 1
-
-    data['position'] = data['signal'].replace(0, np.nan).ffill().fillna(0)
-    data.loc[abs(data['z_score']) < 0.5, 'position'] = 0
+    data['position'] = data['signal'].ffill().fillna(0)
 
     returns_cvx = data['CVX'].pct_change()
     returns_xom = data['XOM'].pct_change()
 
     data['strategy_returns'] = data['position'].shift(1) * (returns_cvx - returns_xom * data['beta'].shift(1))
     data['cumulative_returns'] = (1 + data['strategy_returns']).cumprod()
+    return data
+
 
-    total_return = data['cumulative_returns'][-1] - 1
-    sharpe_ratio = data['strategy_returns'].mean() / data['strategy_returns'].std() * np.sqrt(252)
-    trades = data['signal'].diff().abs().sum()
+def vectorized_backtest(timeframe='1d', periods_per_year=None):
+    tickers = ['XOM', 'CVX']
+    data = pd.DataFrame({t: load(t, '2023-01-01', '2025-01-01', timeframe)['close'] for t in tickers})
+    data = data.dropna()
+
+    data = backtest(data)
+
+    total_return = data['cumulative_returns'].iloc[-1] - 1
+    sharpe_ratio = data['strategy_returns'].mean() / data['strategy_returns'].std() * np.sqrt(periods_per_year or infer_periods_per_year(data.index))
+    trades = data['position'].diff().abs().sum()
     max_drawdown = (data['cumulative_returns'] / data['cumulative_returns'].cummax() - 1).min()
 
     print(f"--- ADAPTIVE STRATEGY RESULTS ---")
@@ -72,7 +86,127 @@ def vectorized_backtest():
     print(f"Figure saved as {file_name}")
     plt.show()
 
-if __name__ == "__main__":
-    vectorized_backtest()
+def rolling_zscores(spread, z_windows):
+    """
+    Rolling z-score of the spread for every z-window at once (T x K).
+
+    Uses cumulative sums so each window costs O(T) with no Python loop;
+    the spread is centred first to keep the running sums well conditioned.
+    """
+    values = spread.to_numpy(dtype=float)
+    values = values - values.mean()
+    n = np.asarray(z_windows)
+
+    cum = np.concatenate([[0.0], np.cumsum(values)])
+    cum_sq = np.concatenate([[0.0], np.cumsum(values ** 2)])
+    end = np.arange(1, len(values) + 1)[:, None]
+    start = end - n
+    valid = start >= 0
+    start = np.where(valid, start, 0)
+
+    total = cum[end] - cum[start]
+    mean = total / n
+    var = (cum_sq[end] - cum_sq[start] - total * mean) / (n - 1)
+    # A flat window has zero variance; rounding in the sums can leave a tiny
+    # positive residue instead, so treat anything that small as flat (NaN, as pandas gives)
+    flat = var <= 1e-12 * max((values ** 2).max(), 1e-300)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (values[:, None] - mean) / np.sqrt(np.where(flat, np.nan, var))
+    z[~valid] = np.nan
+    return z
+
+
+def threshold_positions(z, entry_thresholds, exit_thresholds):
+    """
+    Apply the enter/hold/exit rule of `backtest` to every threshold pair.
+
+    Takes z-scores shaped (T, K) and returns the positions (T, K, E, X) in
+    one vectorized pass.
+    """
+    z = z[:, :, None, None]
+    entry = np.asarray(entry_thresholds, dtype=float)[:, None]
+    exits = np.asarray(exit_thresholds, dtype=float)
+    signal = np.where(z > entry, -1.0, np.where(z < -entry, 1.0,
+                      np.where(np.abs(z) < exits, 0.0, np.nan)))
+
+    # Forward-fill the last event (the .ffill() step) via the index of the last non-NaN row
+    rows = np.arange(len(signal))[:, None, None, None]
+    last = np.maximum.accumulate(np.where(np.isnan(signal), -1, rows), axis=0)
+    held = np.take_along_axis(signal, np.maximum(last, 0), axis=0)
+    return np.where(last >= 0, held, 0.0)
+
+
+def sweep(data, windows=(70,), z_windows=(35,), entry_thresholds=(2.0,), exit_thresholds=(0.5,), periods_per_year=None):
+    """
+    Metrics for every (window, z_window, entry, exit) combination, ranked by Sharpe.
+
+    The rolling OLS and spread run once per beta window; all z-windows and
+    threshold pairs are then evaluated together as arrays. Pairs whose exit
+    is not below the entry are skipped. Sharpe is annualised with
+    ``periods_per_year``, by default inferred from the spacing of the bars.
+    """
+    z_windows = list(z_windows)
+    entry_thresholds = list(entry_thresholds)
+    exit_thresholds = list(exit_thresholds)
+
+    annual = np.sqrt(periods_per_year or infer_periods_per_year(data.index))
+    grids = []
+    for window in windows:
+        spread = hedged_spread(data, window)
+        hedge = (spread['CVX'].pct_change() - spread['XOM'].pct_change() * spread['beta'].shift(1)).to_numpy()
+
+        z = rolling_zscores(spread['spread'], z_windows)
+        position = threshold_positions(z, entry_thresholds, exit_thresholds)
+
+        # First row has no previous position or return, as in `backtest`
+        strategy_returns = position[:-1] * hedge[1:, None, None, None]
+        cumulative_returns = np.cumprod(1 + strategy_returns, axis=0)
+        drawdown = cumulative_returns / np.maximum.accumulate(cumulative_returns, axis=0) - 1
+        trades = np.abs(np.diff(position, axis=0)).sum(axis=0)
+
+        k, e, x = np.meshgrid(np.arange(len(z_windows)), np.arange(len(entry_thresholds)),
+                              np.arange(len(exit_thresholds)), indexing='ij')
+        k, e, x = k.ravel(), e.ravel(), x.ravel()
+        grids.append(pd.DataFrame({
+            'window': window,
+            'z_window': np.asarray(z_windows)[k],
+            'entry': np.asarray(entry_thresholds)[e],
+            'exit': np.asarray(exit_thresholds)[x],
+            'total_return': (cumulative_returns[-1] - 1)[k, e, x],
+            'sharpe': (strategy_returns.mean(axis=0) / strategy_returns.std(axis=0, ddof=1) * annual)[k, e, x],
+            'max_drawdown': drawdown.min(axis=0)[k, e, x],
+            'trades': trades[k, e, x].astype(int),
+        }))
+
+    grid = pd.concat(grids, ignore_index=True)
+    grid = grid[grid['exit'] < grid['entry']]
+    return grid.sort_values('sharpe', ascending=False).reset_index(drop=True)
+
+
+def run_sweep(timeframe='1d', periods_per_year=None):
+    tickers = ['XOM', 'CVX']
+    data = pd.DataFrame({t: load(t, '2023-01-01', '2025-01-01', timeframe)['close'] for t in tickers})
+    data = data.dropna()
+
+    grid = sweep(data,
+                 windows=[30, 50, 70, 90, 120],
+                 z_windows=[10, 15, 20, 25, 35, 50, 70],
+                 entry_thresholds=[1.0, 1.5, 2.0, 2.5, 3.0],
+                 exit_thresholds=[0.0, 0.25, 0.5, 0.75, 1.0],
+                 periods_per_year=periods_per_year)
 
+    print(f"--- Z-SCORE SWEEP: {len(grid)} combinations ---")
+    print(grid.head(20).to_string(index=False))
+    return grid
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the adaptive pairs mean reversion strategy.")
+    parser.add_argument("--sweep", action="store_true", help="Rank a grid of windows and thresholds instead")
+    parser.add_argument("--timeframe", default="1d", choices=TIMEFRAMES.keys())
+    parser.add_argument("--periods-per-year", type=float, help="Bars per year for the Sharpe ratio (default: inferred)")
+    args = parser.parse_args()
+
+    if args.sweep:
+        run_sweep(args.timeframe, args.periods_per_year)
+    else:
+        vectorized_backtest(args.timeframe, args.periods_per_year)
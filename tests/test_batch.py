@@ -0,0 +1,93 @@
+import pytest
+import pandas as pd
+import datetime as dt
+import math
+import warnings
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+from src.backtest_strategies.batch import expand_jobs, plan, run_batch, run_job
+
+
+@pytest.fixture
+def spec():
+    return {
+        'defaults': {'start': '2023-01-01', 'end': '2023-12-31'},
+        'jobs': [
+            {'strategy': 'SMAGoldenCross', 'symbols': ['AAA', 'BBB'], 'params': {'fast': 10, 'slow': 30}},
+            {'strategy': 'PairsTrading', 'symbols': [['AAA', 'BBB']]},
+            {'strategy': 'vectorized.sma', 'symbols': ['AAA'],
+             'params': [{'fast_window': 10, 'slow_window': 30}, {'fast_window': 10, 'slow_window': 50}]},
+        ],
+    }
+
+@pytest.fixture
+def loader():
+    """Sine-wave bars that count how often each symbol is requested."""
+    calls = []
+
+    def load(symbol, start, end, timeframe):
+        calls.append(symbol)
+        dates = [dt.datetime(2023, 1, 1) + dt.timedelta(days=i) for i in range(200)]
+        shift = 0 if symbol == 'AAA' else 3
+        prices = [100 + 20 * math.sin((i + shift) / 10.0) for i in range(200)]
+        return pd.DataFrame({'open': prices, 'high': prices, 'low': prices, 'close': prices, 'volume': 1000}, index=dates)
+
+    load.calls = calls
+    return load
+
+# ==========================================
+# UNIT TEST
+# ==========================================
+
+def test_plan_shares_data_and_indicators(spec):
+    jobs = expand_jobs(spec)
+    graph = plan(jobs)
+    assert len(jobs) == 5
+    assert sorted(k[1] for k in graph if k[0] == 'data') == ['AAA', 'BBB']
+    # SMA(10) is shared by both vectorized param sets
+    assert sorted(k[6] for k in graph if k[0] == 'indicator') == [10, 30, 50]
+
+def test_unknown_strategy_rejected():
+    with pytest.raises(ValueError):
+        expand_jobs({'jobs': [{'strategy': 'Nope', 'symbols': ['AAA']}]})
+
+def test_run_batch_loads_once_and_resumes(spec, loader, tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    jobs = expand_jobs(spec)
+
+    records = run_batch(jobs, checkpoint=checkpoint, loader=loader)
+    assert len(records) == len(jobs)
+    assert sorted(loader.calls) == ['AAA', 'BBB']
+
+    records = run_batch(jobs, checkpoint=checkpoint, loader=loader)
+    assert len(records) == len(jobs)
+    assert len(loader.calls) == 2
+
+def test_failed_load_only_fails_dependent_jobs(spec, loader, tmp_path):
+    def flaky(symbol, start, end, timeframe):
+        if symbol == 'BBB':
+            raise IOError("download failed")
+        return loader(symbol, start, end, timeframe)
+
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    jobs = expand_jobs(spec)
+    records = run_batch(jobs, checkpoint=checkpoint, loader=flaky)
+    assert sorted(r['strategy'] for r in records) == ['SMAGoldenCross', 'vectorized.sma', 'vectorized.sma']
+
+    records = run_batch(jobs, checkpoint=checkpoint, loader=loader)
+    assert len(records) == len(jobs)
+    assert loader.calls.count('BBB') == 1
+
+def test_cash_change_is_a_new_job(spec):
+    ids = {job['id'] for job in expand_jobs(spec)}
+    spec['defaults']['cash'] = 50000.0
+    assert ids.isdisjoint(job['id'] for job in expand_jobs(spec))
+
+def test_backtrader_and_vectorized_metrics_agree(loader):
+    """Long-only SMA crossover traded both ways should score alike."""
+    spec = {'defaults': {'start': '2023-01-01', 'end': '2023-12-31'},
+            'jobs': [{'strategy': 'SMAGoldenCross', 'symbols': ['AAA'], 'params': {'fast': 5, 'slow': 20}},
+                     {'strategy': 'vectorized.sma', 'symbols': ['AAA'], 'params': {'fast_window': 5, 'slow_window': 20}}]}
+    event, vector = [r['metrics'] for r in run_batch(expand_jobs(spec), loader=loader)]
+    assert abs(event['total_trades'] - vector['total_trades']) <= 2
+    assert event['sharpe'] == pytest.approx(vector['sharpe'], rel=0.1)
@@ -0,0 +1,137 @@
+import pytest
+import numpy as np
+import pandas as pd
+import warnings
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+from src.backtest_strategies.data import BarStore, infer_periods_per_year, resample
+
+
+def make_bars(start, end, freq):
+    dates = pd.date_range(start, end, freq=freq, inclusive='left')
+    close = 100 + np.cumsum(np.sin(np.arange(len(dates)) / 7.0))
+    return pd.DataFrame({'open': close - 0.5, 'high': close + 1, 'low': close - 1,
+                         'close': close, 'volume': np.arange(len(dates)) + 1.0}, index=dates)
+
+@pytest.fixture
+def fetch():
+    """Business-day bars that record every (start, end) requested."""
+    calls = []
+
+    def fetch_bars(symbol, start, end, interval):
+        calls.append((pd.Timestamp(start), pd.Timestamp(end), interval))
+        return make_bars(start, end, {'1d': 'B', '1h': 'h'}[interval])
+
+    fetch_bars.calls = calls
+    return fetch_bars
+
+# ==========================================
+# UNIT TEST
+# ==========================================
+
+def test_resample_aggregates_ohlcv():
+    bars = make_bars('2024-01-02 09:30', '2024-01-02 10:30', 'min')
+    five = resample(bars, '5m')
+    first = bars.iloc[:5]
+    assert five.index[0] == pd.Timestamp('2024-01-02 09:30')
+    assert five['open'].iloc[0] == first['open'].iloc[0]
+    assert five['high'].iloc[0] == first['high'].max()
+    assert five['low'].iloc[0] == first['low'].min()
+    assert five['close'].iloc[0] == first['close'].iloc[-1]
+    assert five['volume'].iloc[0] == first['volume'].sum()
+    assert five['volume'].sum() == bars['volume'].sum()
+
+def test_store_serves_cached_ranges_and_timeframes(fetch, tmp_path):
+    store = BarStore(root=str(tmp_path), fetch=fetch)
+    daily = store.bars('AAA', '2024-01-01', '2024-06-01')
+    weekly = store.bars('AAA', '2024-02-01', '2024-05-01', timeframe='1wk')
+    store.bars('AAA', '2024-03-01', '2024-04-01')
+
+    assert len(fetch.calls) == 1
+    assert (weekly.index.dayofweek == 0).all()
+    assert weekly['volume'].iloc[0] == daily.loc[weekly.index[0]:weekly.index[1], 'volume'].iloc[:-1].sum()
+
+def test_store_downloads_only_missing_range(fetch, tmp_path):
+    store = BarStore(root=str(tmp_path), fetch=fetch)
+    store.bars('AAA', '2024-03-01', '2024-06-01')
+    bars = store.bars('AAA', '2024-01-01', '2024-08-01')
+    assert [c[:2] for c in fetch.calls[1:]] == [(pd.Timestamp('2024-01-01'), pd.Timestamp('2024-03-01')),
+                                                (pd.Timestamp('2024-06-01'), pd.Timestamp('2024-08-01'))]
+    assert bars.index.is_monotonic_increasing and bars.index.is_unique
+
+def test_append_patches_derived_timeframes(fetch, tmp_path):
+    store = BarStore(root=str(tmp_path), fetch=fetch)
+    store.bars('AAA', '2024-01-01', '2024-03-13', timeframe='1d')
+    store.bars('AAA', '2024-01-01', '2024-03-13', timeframe='1wk')
+    store.bars('AAA', '2024-01-01', '2024-03-13', timeframe='1mo')
+
+    store.append('AAA', make_bars('2024-03-11', '2024-05-01', 'B') * 1.1)
+    daily = store.bars('AAA', '2024-01-01', '2024-03-13', timeframe='1d')
+    full = store._read('AAA', '1d')
+    for timeframe in ['1wk', '1mo']:
+        pd.testing.assert_frame_equal(store._read('AAA', timeframe), resample(full, timeframe), check_freq=False)
+    assert len(daily) == len(full[full.index < '2024-03-13'])
+
+def test_intraday_base_is_kept_apart_from_daily(fetch, tmp_path):
+    store = BarStore(root=str(tmp_path), fetch=fetch)
+    weekly = store.bars('AAA', '2020-01-01', '2024-02-01', timeframe='1wk')
+    hourly = store.bars('AAA', '2024-01-01', '2024-01-08', timeframe='1h')
+    again = store.bars('AAA', '2020-01-01', '2024-02-01', timeframe='1wk')
+    store.bars('AAA', '2024-01-02', '2024-01-05', timeframe='1h')
+
+    # Neither request evicts the other or asks for years of hourly bars
+    assert [(c[0].year, c[2]) for c in fetch.calls] == [(2020, '1d'), (2024, '1h')]
+    assert len(hourly) == 7 * 24
+    pd.testing.assert_frame_equal(again, weekly)
+
+def test_coarse_timeframe_first_does_not_block_daily(fetch, tmp_path):
+    store = BarStore(root=str(tmp_path), fetch=fetch)
+    store.bars('AAA', '2024-01-01', '2024-06-01', timeframe='1wk')
+    daily = store.bars('AAA', '2024-01-01', '2024-06-01', timeframe='1d')
+    assert len(fetch.calls) == 1
+    assert len(daily) == len(make_bars('2024-01-01', '2024-06-01', 'B'))
+
+def test_empty_download_is_not_cached(fetch, tmp_path):
+    attempts = []
+
+    def flaky(symbol, start, end, interval):
+        attempts.append(start)
+        if len(attempts) == 1:
+            return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'], dtype=float)
+        return fetch(symbol, start, end, interval)
+
+    store = BarStore(root=str(tmp_path), fetch=flaky)
+    assert store.bars('AAA', '2024-01-01', '2024-03-01').empty
+    assert not (tmp_path / 'AAA' / '1d' / 'meta.json').exists()
+    assert len(store.bars('AAA', '2024-01-01', '2024-03-01')) > 0
+
+def test_append_widens_cached_range(fetch, tmp_path):
+    store = BarStore(root=str(tmp_path), fetch=fetch)
+    store.bars('AAA', '2024-01-01', '2024-03-01')
+    store.append('AAA', make_bars('2024-03-01', '2024-04-01', 'B') * 2, start='2024-03-01', end='2024-04-01')
+    bars = store.bars('AAA', '2024-01-01', '2024-04-01')
+
+    assert len(fetch.calls) == 1
+    assert bars['close'].iloc[-1] == (make_bars('2024-03-01', '2024-04-01', 'B') * 2)['close'].iloc[-1]
+
+def test_weekend_boundaries_are_not_refetched(fetch, tmp_path):
+    store = BarStore(root=str(tmp_path), fetch=fetch)
+    # Both ends fall on a weekend, so no bar sits on either boundary
+    store.bars('AAA', '2022-01-01', '2023-01-01')
+    store.bars('AAA', '2022-01-01', '2023-01-01')
+    store.bars('AAA', '2024-01-06 12:00', '2024-01-13 12:00', timeframe='1h')
+    store.bars('AAA', '2024-01-06 12:00', '2024-01-13 12:00', timeframe='1h')
+    assert len(fetch.calls) == 2
+
+def test_hourly_bins_follow_session_open():
+    bars = make_bars('2024-01-02 09:30', '2024-01-02 16:00', 'min')
+    hourly = resample(bars, '1h')
+    assert hourly.index[0] == pd.Timestamp('2024-01-02 09:30')
+    assert len(hourly) == 7
+    assert hourly['volume'].iloc[0] == bars['volume'].iloc[:60].sum()
+
+def test_periods_per_year_follow_bar_spacing():
+    equity = pd.date_range('2023-01-02', '2025-01-01', freq='B')
+    crypto = pd.date_range('2023-01-01', '2025-01-01', freq='h')
+    assert infer_periods_per_year(equity) == pytest.approx(261, rel=0.01)
+    assert infer_periods_per_year(crypto) == pytest.approx(24 * 365.25, rel=0.01)
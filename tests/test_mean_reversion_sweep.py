@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+import pandas as pd
+import warnings
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+from src.vectorized_backtest.mean_reversion import backtest, rolling_zscores, sweep, threshold_positions
+
+
+@pytest.fixture
+def mock_pair_prices():
+    """XOM random walk with CVX tracking it through a mean-reverting spread."""
+    rng = np.random.default_rng(7)
+    dates = pd.date_range("2023-01-01", periods=400, freq="B")
+    xom = 100 + np.cumsum(rng.normal(0, 1, 400))
+    noise = np.zeros(400)
+    for i in range(1, 400):
+        noise[i] = 0.8 * noise[i - 1] + rng.normal(0, 1.5)
+    cvx = 20 + 1.3 * xom + noise
+    return pd.DataFrame({'CVX': cvx, 'XOM': xom}, index=dates)
+
+# ==========================================
+# UNIT TEST
+# ==========================================
+
+def test_rolling_zscores_match_pandas(mock_pair_prices):
+    spread = mock_pair_prices['CVX'] - mock_pair_prices['XOM']
+    z = rolling_zscores(spread, [10, 35])
+    for col, window in enumerate([10, 35]):
+        expected = (spread - spread.rolling(window).mean()) / spread.rolling(window).std()
+        np.testing.assert_allclose(z[:, col], expected.to_numpy(), rtol=1e-8, atol=1e-8)
+
+def test_rolling_zscores_flat_window_is_nan():
+    spread = pd.Series(np.r_[np.linspace(1, 2, 20), np.full(15, 3.0), np.linspace(3, 1, 20)])
+    z = rolling_zscores(spread, [10])[:, 0]
+    expected = ((spread - spread.rolling(10).mean()) / spread.rolling(10).std()).to_numpy()
+    assert np.isnan(z[29:35]).all()
+    np.testing.assert_array_equal(np.isnan(z), np.isnan(expected))
+
+def test_sweep_matches_single_backtest(mock_pair_prices):
+    grid = sweep(mock_pair_prices, windows=[40, 70], z_windows=[15, 35],
+                 entry_thresholds=[1.5, 2.0], exit_thresholds=[0.0, 0.5], periods_per_year=252)
+    assert len(grid) == 16
+    assert grid['sharpe'].is_monotonic_decreasing
+
+    for row in grid.itertuples():
+        data = backtest(mock_pair_prices, row.window, row.z_window, row.entry, row.exit)
+        returns = data['strategy_returns']
+        assert row.total_return == pytest.approx(data['cumulative_returns'].iloc[-1] - 1)
+        assert row.sharpe == pytest.approx(returns.mean() / returns.std() * np.sqrt(252))
+        cumulative = data['cumulative_returns']
+        assert row.max_drawdown == pytest.approx((cumulative / cumulative.cummax() - 1).min())
+        assert row.trades == data['position'].diff().abs().sum()
+
+def test_sweep_skips_exit_above_entry(mock_pair_prices):
+    grid = sweep(mock_pair_prices, entry_thresholds=[1.0], exit_thresholds=[0.5, 1.5])
+    assert grid['exit'].tolist() == [0.5]
+
+def test_position_holds_until_exit_band():
+    z = np.array([0.0, 2.5, 1.0, 0.3, 1.0, -2.5, -1.0, np.nan, -0.2])[:, None]
+    position = threshold_positions(z, [2.0], [0.5])[:, 0, 0, 0]
+    np.testing.assert_array_equal(position, [0, -1, -1, 0, 0, 1, 1, 1, 0])